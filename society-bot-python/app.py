@@ -4,22 +4,22 @@
 Web App Entry Point for Render Free Tier
 ============================================
 
-This module provides a Flask web server that:
+This module provides an aiohttp web server that:
 1. Keeps the Render free web service alive
-2. Runs the Telegram bot in the background
+2. Runs the Telegram bot on the same event loop
 
 Render free tier requires a web service that
 responds to HTTP requests to stay alive.
+
+The bot and the health-check endpoints share a single
+asyncio event loop - no background thread, no second
+event loop, no cross-thread state.
 """
 
 import os
-import sys
-import asyncio
-import threading
 import logging
-from logging.handlers import RotatingFileHandler
 
-from flask import Flask, jsonify
+from aiohttp import web
 from dotenv import load_dotenv
 
 # Load environment variables first
@@ -28,136 +28,93 @@ load_dotenv()
 # Import after env is loaded
 from config.db import init_db, close_db
 from services.telegram_bot import create_application, set_bot_commands
+from utils.logging_setup import setup_logging
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+async def on_startup(app: web.Application) -> None:
+    """Initialize the database and start the Telegram bot."""
+    # Initialize database
+    logger.info("📦 Initializing database connection...")
+    await init_db()
 
-# Flask app
-app = Flask(__name__)
-
-# Global variables
-bot_thread = None
-bot_running = False
-
-
-def setup_logging() -> None:
-    """Configure logging for the application."""
-    log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-    
-    # Create logs directory if it doesn't exist
-    os.makedirs('logs', exist_ok=True)
-    
-    # Configure root logger
-    logging.basicConfig(
-        level=getattr(logging, log_level, logging.INFO),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            # Console handler
-            logging.StreamHandler(sys.stdout),
-            # File handler with rotation
-            RotatingFileHandler(
-                'logs/bot.log',
-                maxBytes=5*1024*1024,  # 5 MB
-                backupCount=5,
-                encoding='utf-8'
-            )
-        ]
+    # Create bot application
+    logger.info("🤖 Initializing Telegram bot...")
+    application = create_application()
+    app['telegram_app'] = application
+
+    # Initialize the application
+    await application.initialize()
+
+    # Set bot commands
+    await set_bot_commands(application)
+
+    # Start the bot with polling
+    await application.start()
+    await application.updater.start_polling(
+        drop_pending_updates=True,
+        allowed_updates=['message']
     )
-    
-    # Reduce noise from external libraries
-    logging.getLogger('httpx').setLevel(logging.WARNING)
-    logging.getLogger('httpcore').setLevel(logging.WARNING)
-    logging.getLogger('telegram').setLevel(logging.WARNING)
-    logging.getLogger('werkzeug').setLevel(logging.WARNING)
-    
-    logger = logging.getLogger(__name__)
-    logger.info(f"Logging configured with level: {log_level}")
-
-
-def run_bot():
-    """Run the Telegram bot in a separate thread."""
-    global bot_running
-    logger = logging.getLogger(__name__)
-    
-    async def start_bot():
-        global bot_running
-        application = None
-        
+
+    app['bot_running'] = True
+    logger.info("🚀 Bot started successfully!")
+
+
+async def on_cleanup(app: web.Application) -> None:
+    """Stop the Telegram bot and close database connections."""
+    app['bot_running'] = False
+
+    application = app.get('telegram_app')
+    if application:
         try:
-            # Initialize database
-            logger.info("📦 Initializing database connection...")
-            init_db()
-            
-            # Create bot application
-            logger.info("🤖 Initializing Telegram bot...")
-            application = create_application()
-            
-            # Initialize the application
-            await application.initialize()
-            
-            # Set bot commands
-            await set_bot_commands(application)
-            
-            logger.info("🚀 Bot started successfully!")
-            bot_running = True
-            
-            # Start the bot with polling
-            await application.start()
-            await application.updater.start_polling(
-                drop_pending_updates=True,
-                allowed_updates=['message']
-            )
-            
-            # Keep running
-            while bot_running:
-                await asyncio.sleep(1)
-                
+            if application.updater and application.updater.running:
+                await application.updater.stop()
+            await application.stop()
+            await application.shutdown()
+            logger.info("🛑 Telegram bot stopped")
         except Exception as e:
-            logger.error(f"❌ Bot error: {e}")
-            bot_running = False
-            
-        finally:
-            if application:
-                try:
-                    if application.updater and application.updater.running:
-                        await application.updater.stop()
-                    await application.stop()
-                    await application.shutdown()
-                except Exception as e:
-                    logger.error(f"Error during shutdown: {e}")
-            
-            try:
-                close_db()
-            except Exception as e:
-                logger.error(f"Error closing database: {e}")
-    
-    # Run the async bot
-    asyncio.run(start_bot())
-
-
-@app.route('/')
-def home():
+            logger.error(f"Error during shutdown: {e}")
+
+    try:
+        await close_db()
+    except Exception as e:
+        logger.error(f"Error closing database: {e}")
+
+
+async def home(request: web.Request) -> web.Response:
     """Health check endpoint."""
-    return jsonify({
+    return web.json_response({
         'status': 'running',
         'service': 'Society Payment Tracker Bot',
-        'bot_running': bot_running
+        'bot_running': request.app.get('bot_running', False)
     })
 
 
-@app.route('/health')
-def health():
+async def health(request: web.Request) -> web.Response:
     """Health check for Render."""
-    return jsonify({'status': 'healthy', 'bot': 'running' if bot_running else 'starting'})
+    bot_running = request.app.get('bot_running', False)
+    return web.json_response({
+        'status': 'healthy',
+        'bot': 'running' if bot_running else 'starting'
+    })
 
 
-def start_bot_thread():
-    """Start the bot in a background thread."""
-    global bot_thread
-    if bot_thread is None or not bot_thread.is_alive():
-        bot_thread = threading.Thread(target=run_bot, daemon=True)
-        bot_thread.start()
-        logging.getLogger(__name__).info("🤖 Bot thread started")
+def create_app() -> web.Application:
+    """Create the aiohttp application with bot lifecycle hooks."""
+    app = web.Application()
+    app['bot_running'] = False
+    app.add_routes([
+        web.get('/', home),
+        web.get('/health', health),
+    ])
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
 
 
-# Setup logging and start bot when module loads
+# Setup logging and build the app when module loads
 setup_logging()
 
 print()
@@ -166,10 +123,9 @@ print("  Society Payment Tracker Bot v1.0.0 (Render)")
 print("=" * 48)
 print()
 
-# Start bot in background thread
-start_bot_thread()
+app = create_app()
 
 if __name__ == '__main__':
     # For local testing
     port = int(os.getenv('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=False)
+    web.run_app(app, host='0.0.0.0', port=port)
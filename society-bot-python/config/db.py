@@ -7,9 +7,9 @@ This module creates and manages MySQL database connections
 with connection pooling for efficient database operations.
 
 Features:
-- Connection pooling for better performance
+- Async connection pooling (aiomysql) on the bot event loop
 - SSL support for cloud databases (Render, PlanetScale, etc.)
-- Async-compatible synchronous operations
+- Non-blocking queries - handlers no longer freeze each other
 - Automatic connection management
 - Environment-based configuration
 """
@@ -17,11 +17,11 @@ Features:
 import os
 import ssl
 import logging
-from contextlib import contextmanager
-from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any
 
-import mysql.connector
-from mysql.connector import pooling, Error
+import aiomysql
+from aiomysql import Error
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -33,9 +33,9 @@ logger = logging.getLogger(__name__)
 
 class DatabaseConfig:
     """Database configuration and connection pool manager."""
-    
-    _pool: Optional[pooling.MySQLConnectionPool] = None
-    
+
+    _pool: Optional[aiomysql.Pool] = None
+
     @classmethod
     def get_config(cls) -> Dict[str, Any]:
         """Get database configuration from environment variables."""
@@ -44,126 +44,153 @@ class DatabaseConfig:
             'port': int(os.getenv('DB_PORT', '3306')),
             'user': os.getenv('DB_USER', 'root'),
             'password': os.getenv('DB_PASSWORD', ''),
-            'database': os.getenv('DB_NAME', 'society_payments_db'),
+            'db': os.getenv('DB_NAME', 'society_payments_db'),
             'charset': 'utf8mb4',
-            'collation': 'utf8mb4_unicode_ci',
             'autocommit': True,
-            'get_warnings': True,
         }
-        
+
         # Enable SSL for cloud database connections
         if os.getenv('DB_SSL', 'false').lower() == 'true':
-            config['ssl_disabled'] = False
-            config['ssl_verify_cert'] = False
-            config['ssl_verify_identity'] = False
+            ssl_context = ssl.create_default_context()
+            ssl_context.check_hostname = False
+            ssl_context.verify_mode = ssl.CERT_NONE
+            config['ssl'] = ssl_context
             logger.info("   SSL: Enabled for cloud database")
-        
+
         return config
-    
+
+    @classmethod
+    def get_pool_size(cls) -> int:
+        """
+        Determine the connection pool size.
+
+        Reads DB_POOL_SIZE from the environment, defaulting to
+        max(10, 2 * CPU count) for bursty concurrent handler load.
+        Capped at 32 to keep connection counts reasonable.
+
+        Returns:
+            Pool size to use
+        """
+        default_size = max(10, 2 * (os.cpu_count() or 1))
+        pool_size = int(os.getenv('DB_POOL_SIZE', str(default_size)))
+        return min(max(pool_size, 1), 32)
+
     @classmethod
-    def initialize_pool(cls, pool_size: int = 5) -> None:
+    async def initialize_pool(cls, pool_size: Optional[int] = None) -> None:
         """
         Initialize the MySQL connection pool.
-        
+
         Args:
-            pool_size: Number of connections in the pool
+            pool_size: Maximum number of connections in the pool.
+                       Defaults to DB_POOL_SIZE env var or max(10, 2*cpu_count).
         """
         if cls._pool is not None:
             logger.warning("Connection pool already initialized")
             return
-        
+
+        if pool_size is None:
+            pool_size = cls.get_pool_size()
+
         try:
             config = cls.get_config()
-            cls._pool = pooling.MySQLConnectionPool(
-                pool_name="society_payments_pool",
-                pool_size=pool_size,
-                pool_reset_session=True,
+            # Connections go back to the pool without a session reset
+            # round-trip. That is safe because every statement here runs
+            # under autocommit with no session state (no temp tables, no
+            # user variables); any future code that sets session state
+            # must clear it before releasing the connection.
+            cls._pool = await aiomysql.create_pool(
+                minsize=2,
+                maxsize=pool_size,
                 **config
             )
             logger.info("✅ MySQL connection pool initialized successfully")
             logger.info(f"   Host: {config['host']}:{config['port']}")
-            logger.info(f"   Database: {config['database']}")
+            logger.info(f"   Database: {config['db']}")
             logger.info(f"   Pool Size: {pool_size}")
         except Error as e:
             logger.error(f"❌ Failed to initialize connection pool: {e}")
             raise
-    
+
     @classmethod
-    def get_pool(cls) -> pooling.MySQLConnectionPool:
+    async def get_pool(cls) -> aiomysql.Pool:
         """Get the connection pool, initializing if necessary."""
         if cls._pool is None:
-            cls.initialize_pool()
+            await cls.initialize_pool()
         return cls._pool
-    
+
     @classmethod
-    @contextmanager
-    def get_connection(cls):
+    @asynccontextmanager
+    async def get_connection(cls):
         """
-        Context manager for getting a database connection from the pool.
-        
+        Async context manager for getting a database connection from the pool.
+
         Usage:
-            with DatabaseConfig.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT * FROM table")
+            async with DatabaseConfig.get_connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute("SELECT * FROM table")
         """
-        connection = None
         try:
-            pool = cls.get_pool()
-            connection = pool.get_connection()
-            yield connection
+            pool = await cls.get_pool()
+            async with pool.acquire() as connection:
+                yield connection
         except Error as e:
             logger.error(f"❌ Database connection error: {e}")
             raise
-        finally:
-            if connection and connection.is_connected():
-                connection.close()
-    
+
     @classmethod
-    @contextmanager
-    def get_cursor(cls, dictionary: bool = True):
+    @asynccontextmanager
+    async def get_cursor(cls, dictionary: bool = True, server_side: bool = False):
         """
-        Context manager for getting a database cursor.
-        
+        Async context manager for getting a database cursor.
+
         Args:
             dictionary: If True, returns rows as dictionaries
-            
+            server_side: If True, uses an unbuffered (server-side) cursor
+                         that streams rows instead of fetching the whole
+                         result set into memory
+
         Usage:
-            with DatabaseConfig.get_cursor() as cursor:
-                cursor.execute("SELECT * FROM table")
-                rows = cursor.fetchall()
+            async with DatabaseConfig.get_cursor() as cursor:
+                await cursor.execute("SELECT * FROM table")
+                rows = await cursor.fetchall()
         """
-        with cls.get_connection() as connection:
-            cursor = connection.cursor(dictionary=dictionary)
-            try:
-                yield cursor
-                connection.commit()
-            except Error as e:
-                connection.rollback()
-                logger.error(f"❌ Database error: {e}")
-                raise
-            finally:
-                cursor.close()
-    
+        if server_side:
+            cursor_class = aiomysql.SSDictCursor if dictionary else aiomysql.SSCursor
+        else:
+            cursor_class = aiomysql.DictCursor if dictionary else aiomysql.Cursor
+        # Connections run with autocommit=True and every statement is
+        # self-contained, so there is no transaction to commit or roll
+        # back here - the explicit COMMIT was a wasted round-trip per
+        # operation. Multi-statement transactions should use their own
+        # BEGIN/COMMIT explicitly.
+        async with cls.get_connection() as connection:
+            async with connection.cursor(cursor_class) as cursor:
+                try:
+                    yield cursor
+                except Error as e:
+                    logger.error(f"❌ Database error: {e}")
+                    raise
+
     @classmethod
-    def test_connection(cls) -> bool:
+    async def test_connection(cls) -> bool:
         """
         Test database connection.
-        
+
         Returns:
             True if connection successful
         """
         try:
-            with cls.get_cursor() as cursor:
-                cursor.execute("SELECT 1")
-                cursor.fetchone()
+            async with cls.get_cursor() as cursor:
+                await cursor.execute("SELECT 1")
+                await cursor.fetchone()
             logger.info("✅ Database connection test successful")
             return True
         except Error as e:
             logger.error(f"❌ Database connection test failed: {e}")
             return False
-    
+
     @classmethod
-    def initialize_database(cls) -> None:
+    async def initialize_database(cls) -> None:
         """
         Initialize database tables.
         Creates the society_payments table if it doesn't exist.
@@ -180,19 +207,42 @@ class DatabaseConfig:
                 INDEX idx_recorded_by (recorded_by)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
         """
-        
+
         try:
-            with cls.get_cursor() as cursor:
-                cursor.execute(create_table_sql)
+            async with cls.get_cursor() as cursor:
+                await cursor.execute(create_table_sql)
             logger.info("✅ Database table initialized successfully")
         except Error as e:
             logger.error(f"❌ Failed to initialize database table: {e}")
             raise
-    
+
     @classmethod
-    def close_pool(cls) -> None:
+    async def warm_pool(cls) -> None:
+        """
+        Pre-open every pool connection at startup.
+
+        The pool only creates `minsize` connections up front; without a
+        warmup the first burst of commands pays TCP+auth latency for each
+        extra connection. Opening them all once at startup moves that
+        cost out of the request path.
+        """
+        pool = await cls.get_pool()
+        connections = []
+        try:
+            for _ in range(pool.maxsize):
+                connections.append(await pool.acquire())
+        finally:
+            for connection in connections:
+                pool.release(connection)
+        logger.info(f"✅ Connection pool warmed ({len(connections)} connections)")
+
+    @classmethod
+    async def close_pool(cls) -> None:
         """Close all connections in the pool."""
-        cls._pool = None
+        if cls._pool is not None:
+            cls._pool.close()
+            await cls._pool.wait_closed()
+            cls._pool = None
         logger.info("✅ Database connection pool closed")
 
 
@@ -202,18 +252,19 @@ def get_connection():
     return DatabaseConfig.get_connection()
 
 
-def get_cursor(dictionary: bool = True):
+def get_cursor(dictionary: bool = True, server_side: bool = False):
     """Get a database cursor."""
-    return DatabaseConfig.get_cursor(dictionary=dictionary)
+    return DatabaseConfig.get_cursor(dictionary=dictionary, server_side=server_side)
 
 
-def init_db():
+async def init_db():
     """Initialize database connection pool and tables."""
-    DatabaseConfig.initialize_pool()
-    DatabaseConfig.test_connection()
-    DatabaseConfig.initialize_database()
+    await DatabaseConfig.initialize_pool()
+    await DatabaseConfig.test_connection()
+    await DatabaseConfig.initialize_database()
+    await DatabaseConfig.warm_pool()
 
 
-def close_db():
+async def close_db():
     """Close database connections."""
-    DatabaseConfig.close_pool()
+    await DatabaseConfig.close_pool()
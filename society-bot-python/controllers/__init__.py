@@ -1,5 +1,5 @@
 """Controllers package initialization."""
 
-from .payment_controller import PaymentController, payment_controller
+from . import payment_controller
 
-__all__ = ['PaymentController', 'payment_controller']
+__all__ = ['payment_controller']
@@ -15,297 +15,452 @@ Features:
 - Reset/clear operations
 """
 
+import calendar
 import logging
-from datetime import datetime
+import time
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Final, Tuple
 
 from config.db import get_cursor
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# SQL statements are defined once at module level so each call reuses the
+# same string object (and the driver's statement cache key) instead of
+# rebuilding the SQL text per invocation.
+_SQL_INSERT_PAYMENT: Final[str] = """
+    INSERT INTO society_payments (member_name, amount, recorded_by)
+    VALUES (%s, %s, %s)
+"""
+
+_SQL_GET_LAST_PAYMENTS: Final[str] = """
+    SELECT id, member_name, amount, recorded_by, payment_date
+    FROM society_payments
+    ORDER BY payment_date DESC
+    LIMIT %s
+"""
+
+# Range predicate instead of DATE()/MONTH()/YEAR() on payment_date so
+# idx_payment_date can be used for a range scan
+_SQL_TOTAL_BETWEEN: Final[str] = """
+    SELECT
+        COALESCE(SUM(amount), 0) as total,
+        COUNT(*) as count
+    FROM society_payments
+    WHERE payment_date >= %s AND payment_date < %s
+"""
+
+# member_name is utf8mb4_unicode_ci, so a plain equality compare is
+# already case-insensitive and, unlike LOWER(member_name) = LOWER(%s),
+# can use idx_member_name instead of scanning the whole table
+_SQL_GET_MEMBER_PAYMENTS: Final[str] = """
+    SELECT id, member_name, amount, recorded_by, payment_date
+    FROM society_payments
+    WHERE member_name = %s
+    ORDER BY payment_date DESC
+"""
+
+_SQL_GET_ALL_PAYMENTS: Final[str] = """
+    SELECT id, member_name, amount, recorded_by, payment_date
+    FROM society_payments
+    ORDER BY payment_date DESC
+"""
+
+_SQL_GET_SUMMARY: Final[str] = """
+    SELECT
+        COALESCE(SUM(amount), 0) as total,
+        COUNT(*) as count
+    FROM society_payments
+"""
+
+# DELETE instead of TRUNCATE: TRUNCATE takes an exclusive metadata lock
+# and recreates the tablespace, stalling every in-flight query. DELETE
+# also reports the row count itself.
+_SQL_RESET_DELETE: Final[str] = "DELETE FROM society_payments"
+_SQL_RESET_AUTO_INCREMENT: Final[str] = "ALTER TABLE society_payments AUTO_INCREMENT = 1"
+
+_SQL_GET_STATS: Final[str] = """
+    SELECT
+        COUNT(*) as total_count,
+        COALESCE(SUM(amount), 0) as total_amount,
+        COALESCE(AVG(amount), 0) as avg_amount,
+        COALESCE(MAX(amount), 0) as max_amount,
+        COALESCE(MIN(amount), 0) as min_amount,
+        COUNT(DISTINCT member_name) as unique_members
+    FROM society_payments
+"""
+
+_SQL_GET_COMBINED_STATS: Final[str] = """
+    SELECT
+        COALESCE(SUM(CASE WHEN payment_date >= %s AND payment_date < %s THEN amount END), 0) as today_total,
+        COALESCE(SUM(CASE WHEN payment_date >= %s AND payment_date < %s THEN amount END), 0) as month_total,
+        COUNT(*) as total_count,
+        COALESCE(SUM(amount), 0) as total_amount,
+        COALESCE(AVG(amount), 0) as avg_amount,
+        COALESCE(MAX(amount), 0) as max_amount,
+        COALESCE(MIN(amount), 0) as min_amount,
+        COUNT(DISTINCT member_name) as unique_members
+    FROM society_payments
+"""
+
+
+# Short-lived cache for the aggregate summary queries. A burst of /today
+# or /month commands within the TTL window then costs one table scan
+# instead of one per request; writes clear the cache so results stay
+# consistent within this process.
+_SUMMARY_CACHE_TTL = 10.0  # seconds
+_summary_cache: Dict[Any, Tuple[float, Any]] = {}
+
+
+def _cache_get(key: Any) -> Optional[Any]:
+    """Return the cached value for key, or None if missing/expired."""
+    entry = _summary_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def _cache_set(key: Any, value: Any) -> None:
+    """Cache value under key for the TTL window."""
+    _summary_cache[key] = (time.monotonic() + _SUMMARY_CACHE_TTL, value)
+
 
-class PaymentController:
-    """Controller for payment database operations."""
+def _cache_clear() -> None:
+    """Drop all cached summaries (called after writes)."""
+    _summary_cache.clear()
+
+
+async def insert_payment(member_name: str, amount: float, recorded_by: int) -> Dict[str, Any]:
+    """
+    Insert a new payment record into the database.
     
-    @staticmethod
-    def insert_payment(member_name: str, amount: float, recorded_by: int) -> Dict[str, Any]:
-        """
-        Insert a new payment record into the database.
-        
-        Args:
-            member_name: Name of the member
-            amount: Payment amount
-            recorded_by: Telegram user ID who recorded the payment
-            
-        Returns:
-            Dict with inserted payment details
-        """
-        insert_query = """
-            INSERT INTO society_payments (member_name, amount, recorded_by)
-            VALUES (%s, %s, %s)
-        """
+    Args:
+        member_name: Name of the member
+        amount: Payment amount
+        recorded_by: Telegram user ID who recorded the payment
         
-        select_query = "SELECT * FROM society_payments WHERE id = %s"
+    Returns:
+        Dict with inserted payment details
+    """
+    try:
+        async with get_cursor() as cursor:
+            await cursor.execute(_SQL_INSERT_PAYMENT, (member_name, amount, recorded_by))
+            inserted_id = cursor.lastrowid
+
+        _cache_clear()
+
+        # The only server-generated column besides the id is payment_date,
+        # so build the returned record locally instead of reading it back
+        payment = {
+            'id': inserted_id,
+            'member_name': member_name,
+            'amount': Decimal(str(amount)),
+            'recorded_by': recorded_by,
+            'payment_date': datetime.now()
+        }
+
+        logger.debug("Payment inserted: %s - Rs.%s (ID: %s)", member_name, amount, inserted_id)
+        return payment
         
-        try:
-            with get_cursor() as cursor:
-                cursor.execute(insert_query, (member_name, amount, recorded_by))
-                inserted_id = cursor.lastrowid
-                
-                # Retrieve the inserted record
-                cursor.execute(select_query, (inserted_id,))
-                payment = cursor.fetchone()
-                
-            logger.info(f"✅ Payment inserted: {member_name} - Rs.{amount} (ID: {inserted_id})")
-            return payment
-            
-        except Exception as e:
-            logger.error(f"❌ Error inserting payment: {e}")
-            raise
+    except Exception as e:
+        logger.error(f"❌ Error inserting payment: {e}")
+        raise
+
+async def get_last_payments(limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    Get the last N payment records.
     
-    @staticmethod
-    def get_last_payments(limit: int = 20) -> List[Dict[str, Any]]:
-        """
-        Get the last N payment records.
+    Args:
+        limit: Number of records to retrieve
         
-        Args:
-            limit: Number of records to retrieve
+    Returns:
+        List of payment records
+    """
+    try:
+        async with get_cursor() as cursor:
+            await cursor.execute(_SQL_GET_LAST_PAYMENTS, (limit,))
+            payments = await cursor.fetchall()
             
-        Returns:
-            List of payment records
-        """
-        query = """
-            SELECT id, member_name, amount, recorded_by, payment_date
-            FROM society_payments
-            ORDER BY payment_date DESC
-            LIMIT %s
-        """
+        logger.debug("Retrieved %d payment records", len(payments))
+        return payments
         
-        try:
-            with get_cursor() as cursor:
-                cursor.execute(query, (limit,))
-                payments = cursor.fetchall()
-                
-            logger.info(f"📊 Retrieved {len(payments)} payment records")
-            return payments
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching payments: {e}")
-            raise
+    except Exception as e:
+        logger.error(f"❌ Error fetching payments: {e}")
+        raise
+
+async def get_today_total() -> Dict[str, Any]:
+    """
+    Get today's total collection.
     
-    @staticmethod
-    def get_today_total() -> Dict[str, Any]:
-        """
-        Get today's total collection.
-        
-        Returns:
-            Dict with total amount and count
-        """
-        query = """
-            SELECT 
-                COALESCE(SUM(amount), 0) as total,
-                COUNT(*) as count
-            FROM society_payments
-            WHERE DATE(payment_date) = CURDATE()
-        """
+    Returns:
+        Dict with total amount and count
+    """
+    today = date.today()
+
+    cached = _cache_get(('today', today))
+    if cached is not None:
+        return cached
+
+    try:
+        async with get_cursor() as cursor:
+            await cursor.execute(_SQL_TOTAL_BETWEEN, (today, today + timedelta(days=1)))
+            row = await cursor.fetchone()
+
+        result = {
+            'total': row['total'] or Decimal('0'),
+            'count': int(row['count']) if row['count'] else 0,
+            'date': today.strftime('%Y-%m-%d')
+        }
+        _cache_set(('today', today), result)
+
+        logger.debug("Today's total: Rs.%s (%s payments)", result['total'], result['count'])
+        return result
         
-        try:
-            with get_cursor() as cursor:
-                cursor.execute(query)
-                row = cursor.fetchone()
-                
-            result = {
-                'total': float(row['total']) if row['total'] else 0.0,
-                'count': int(row['count']) if row['count'] else 0,
-                'date': datetime.now().strftime('%Y-%m-%d')
-            }
-            
-            logger.info(f"📅 Today's total: Rs.{result['total']} ({result['count']} payments)")
-            return result
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching today's total: {e}")
-            raise
+    except Exception as e:
+        logger.error(f"❌ Error fetching today's total: {e}")
+        raise
+
+async def get_month_total() -> Dict[str, Any]:
+    """
+    Get current month's total collection.
     
-    @staticmethod
-    def get_month_total() -> Dict[str, Any]:
-        """
-        Get current month's total collection.
-        
-        Returns:
-            Dict with total amount, count, and month info
-        """
-        query = """
-            SELECT 
-                COALESCE(SUM(amount), 0) as total,
-                COUNT(*) as count,
-                MONTHNAME(CURRENT_DATE()) as month_name,
-                YEAR(CURRENT_DATE()) as year
-            FROM society_payments
-            WHERE MONTH(payment_date) = MONTH(CURRENT_DATE())
-            AND YEAR(payment_date) = YEAR(CURRENT_DATE())
-        """
+    Returns:
+        Dict with total amount, count, and month info
+    """
+    today = date.today()
+
+    cached = _cache_get(('month', today.year, today.month))
+    if cached is not None:
+        return cached
+
+    month_start = today.replace(day=1)
+    if today.month == 12:
+        next_month_start = date(today.year + 1, 1, 1)
+    else:
+        next_month_start = date(today.year, today.month + 1, 1)
+
+    try:
+        async with get_cursor() as cursor:
+            await cursor.execute(_SQL_TOTAL_BETWEEN, (month_start, next_month_start))
+            row = await cursor.fetchone()
+
+        result = {
+            'total': row['total'] or Decimal('0'),
+            'count': int(row['count']) if row['count'] else 0,
+            'month_name': calendar.month_name[today.month],
+            'year': today.year
+        }
+        _cache_set(('month', today.year, today.month), result)
+
+        logger.debug("%s %s total: Rs.%s (%s payments)", result['month_name'], result['year'], result['total'], result['count'])
+        return result
         
-        try:
-            with get_cursor() as cursor:
-                cursor.execute(query)
-                row = cursor.fetchone()
-                
-            result = {
-                'total': float(row['total']) if row['total'] else 0.0,
-                'count': int(row['count']) if row['count'] else 0,
-                'month_name': row['month_name'],
-                'year': row['year']
-            }
-            
-            logger.info(f"📆 {result['month_name']} {result['year']} total: Rs.{result['total']} ({result['count']} payments)")
-            return result
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching month total: {e}")
-            raise
+    except Exception as e:
+        logger.error(f"❌ Error fetching month total: {e}")
+        raise
+
+async def get_member_payments(member_name: str) -> Dict[str, Any]:
+    """
+    Get all payments for a specific member.
     
-    @staticmethod
-    def get_member_payments(member_name: str) -> Dict[str, Any]:
-        """
-        Get all payments for a specific member.
+    Args:
+        member_name: Name of the member (case-insensitive)
         
-        Args:
-            member_name: Name of the member (case-insensitive)
-            
-        Returns:
-            Dict with payments array and summary
-        """
-        payments_query = """
-            SELECT id, member_name, amount, recorded_by, payment_date
-            FROM society_payments
-            WHERE LOWER(member_name) = LOWER(%s)
-            ORDER BY payment_date DESC
-        """
+    Returns:
+        Dict with payments array and summary
+    """
+    try:
+        async with get_cursor() as cursor:
+            await cursor.execute(_SQL_GET_MEMBER_PAYMENTS, (member_name,))
+            payments = await cursor.fetchall()
+
+        # Count and total are derived from the fetched rows instead of
+        # a second aggregate query over the same filter
+        result = {
+            'member_name': member_name,
+            'payments': payments,
+            'total_payments': len(payments),
+            'total_amount': sum((p['amount'] for p in payments), Decimal('0'))
+        }
         
-        summary_query = """
-            SELECT 
-                COUNT(*) as count,
-                COALESCE(SUM(amount), 0) as total
-            FROM society_payments
-            WHERE LOWER(member_name) = LOWER(%s)
-        """
+        logger.debug("%s: %s payments, total Rs.%s", member_name, result['total_payments'], result['total_amount'])
+        return result
         
-        try:
-            with get_cursor() as cursor:
-                cursor.execute(payments_query, (member_name,))
-                payments = cursor.fetchall()
-                
-                cursor.execute(summary_query, (member_name,))
-                summary = cursor.fetchone()
-                
-            result = {
-                'member_name': member_name,
-                'payments': payments,
-                'total_payments': int(summary['count']) if summary['count'] else 0,
-                'total_amount': float(summary['total']) if summary['total'] else 0.0
-            }
-            
-            logger.info(f"👤 {member_name}: {result['total_payments']} payments, total Rs.{result['total_amount']}")
-            return result
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching member payments: {e}")
-            raise
+    except Exception as e:
+        logger.error(f"❌ Error fetching member payments: {e}")
+        raise
+
+async def get_all_payments() -> List[Dict[str, Any]]:
+    """
+    Get all payment records for export.
     
-    @staticmethod
-    def get_all_payments() -> List[Dict[str, Any]]:
-        """
-        Get all payment records for export.
-        
-        Returns:
-            List of all payment records
-        """
-        query = """
-            SELECT id, member_name, amount, recorded_by, payment_date
-            FROM society_payments
-            ORDER BY payment_date DESC
-        """
-        
-        try:
-            with get_cursor() as cursor:
-                cursor.execute(query)
-                payments = cursor.fetchall()
-                
-            logger.info(f"📤 Exporting {len(payments)} payment records")
-            return payments
+    Returns:
+        List of all payment records
+    """
+    try:
+        async with get_cursor() as cursor:
+            await cursor.execute(_SQL_GET_ALL_PAYMENTS)
+            payments = await cursor.fetchall()
             
-        except Exception as e:
-            logger.error(f"❌ Error fetching all payments: {e}")
-            raise
-    
-    @staticmethod
-    def reset_all_payments() -> Dict[str, int]:
-        """
-        Delete all payment records (reset).
+        logger.debug("Exporting %d payment records", len(payments))
+        return payments
         
-        Returns:
-            Dict with number of deleted records
-        """
-        count_query = "SELECT COUNT(*) as count FROM society_payments"
-        truncate_query = "TRUNCATE TABLE society_payments"
-        
-        try:
-            with get_cursor() as cursor:
-                # Get count first
-                cursor.execute(count_query)
-                count_result = cursor.fetchone()
-                deleted_count = int(count_result['count']) if count_result['count'] else 0
-                
-                # Truncate table
-                cursor.execute(truncate_query)
-                
-            logger.info(f"🗑️ Deleted {deleted_count} payment records")
-            return {'deleted_count': deleted_count}
-            
-        except Exception as e:
-            logger.error(f"❌ Error resetting payments: {e}")
-            raise
+    except Exception as e:
+        logger.error(f"❌ Error fetching all payments: {e}")
+        raise
+
+async def iter_all_payments():
+    """
+    Iterate over all payment records using a server-side cursor.
+
+    Unlike get_all_payments, rows are streamed from the database one
+    at a time instead of buffered into a list, keeping memory usage
+    constant during large exports.
+
+    Yields:
+        Payment records, newest first (payment date descending)
+    """
+    try:
+        async with get_cursor(server_side=True) as cursor:
+            await cursor.execute(_SQL_GET_ALL_PAYMENTS)
+            async for payment in cursor:
+                yield payment
+
+    except Exception as e:
+        logger.error(f"❌ Error streaming all payments: {e}")
+        raise
+
+async def get_payment_summary() -> Dict[str, Any]:
+    """
+    Get the grand total and record count over all payments.
+
+    The sum runs in the database engine, so callers that stream rows
+    (like the export) don't need to accumulate amounts in Python.
+    Deliberately uncached: the export pairs this with a fresh row
+    stream and a stale total next to fresh rows would be misleading.
+
+    Returns:
+        Dict with total amount and count
+    """
+    try:
+        async with get_cursor() as cursor:
+            await cursor.execute(_SQL_GET_SUMMARY)
+            row = await cursor.fetchone()
+
+        result = {
+            'total': row['total'] or Decimal('0'),
+            'count': int(row['count']) if row['count'] else 0
+        }
+
+        logger.debug("Payment summary: Rs.%s over %s records", result['total'], result['count'])
+        return result
+
+    except Exception as e:
+        logger.error(f"❌ Error fetching payment summary: {e}")
+        raise
+
+async def reset_all_payments() -> Dict[str, int]:
+    """
+    Delete all payment records (reset).
     
-    @staticmethod
-    def get_payment_stats() -> Dict[str, Any]:
-        """
-        Get payment statistics summary.
-        
-        Returns:
-            Dict with various statistics
-        """
-        query = """
-            SELECT 
-                COUNT(*) as total_count,
-                COALESCE(SUM(amount), 0) as total_amount,
-                COALESCE(AVG(amount), 0) as avg_amount,
-                COALESCE(MAX(amount), 0) as max_amount,
-                COALESCE(MIN(amount), 0) as min_amount,
-                COUNT(DISTINCT member_name) as unique_members
-            FROM society_payments
-        """
+    Returns:
+        Dict with number of deleted records
+    """
+    try:
+        async with get_cursor() as cursor:
+            await cursor.execute(_SQL_RESET_DELETE)
+            deleted_count = cursor.rowcount
+
+            # Keep TRUNCATE's id-restart behaviour
+            await cursor.execute(_SQL_RESET_AUTO_INCREMENT)
+
+        _cache_clear()
+
+        logger.info("🗑️ Deleted %d payment records", deleted_count)
+        return {'deleted_count': deleted_count}
         
-        try:
-            with get_cursor() as cursor:
-                cursor.execute(query)
-                row = cursor.fetchone()
-                
-            return {
-                'total_payments': int(row['total_count']) if row['total_count'] else 0,
-                'total_amount': float(row['total_amount']) if row['total_amount'] else 0.0,
-                'average_amount': float(row['avg_amount']) if row['avg_amount'] else 0.0,
-                'max_amount': float(row['max_amount']) if row['max_amount'] else 0.0,
-                'min_amount': float(row['min_amount']) if row['min_amount'] else 0.0,
-                'unique_members': int(row['unique_members']) if row['unique_members'] else 0
-            }
-            
-        except Exception as e:
-            logger.error(f"❌ Error fetching payment stats: {e}")
-            raise
+    except Exception as e:
+        logger.error(f"❌ Error resetting payments: {e}")
+        raise
+
+async def get_payment_stats() -> Dict[str, Any]:
+    """
+    Get payment statistics summary.
+    
+    Returns:
+        Dict with various statistics
+    """
+    cached = _cache_get('stats')
+    if cached is not None:
+        return cached
+
+    try:
+        async with get_cursor() as cursor:
+            await cursor.execute(_SQL_GET_STATS)
+            row = await cursor.fetchone()
+
+        result = {
+            'total_payments': int(row['total_count']) if row['total_count'] else 0,
+            'total_amount': row['total_amount'] or Decimal('0'),
+            'average_amount': row['avg_amount'] or Decimal('0'),
+            'max_amount': row['max_amount'] or Decimal('0'),
+            'min_amount': row['min_amount'] or Decimal('0'),
+            'unique_members': int(row['unique_members']) if row['unique_members'] else 0
+        }
+        _cache_set('stats', result)
+        return result
+
+    except Exception as e:
+        logger.error(f"❌ Error fetching payment stats: {e}")
+        raise
+
+async def get_combined_stats() -> Dict[str, Any]:
+    """
+    Get today's, this month's and all-time aggregates in one query.
+
+    Conditional aggregation answers everything the /stats command
+    needs in a single table pass instead of separate today, month
+    and all-time scans.
+
+    Returns:
+        Dict with today/month totals and overall statistics
+    """
+    today = date.today()
+
+    cached = _cache_get(('combined', today))
+    if cached is not None:
+        return cached
+
+    month_start = today.replace(day=1)
+    if today.month == 12:
+        next_month_start = date(today.year + 1, 1, 1)
+    else:
+        next_month_start = date(today.year, today.month + 1, 1)
+
+    try:
+        async with get_cursor() as cursor:
+            await cursor.execute(_SQL_GET_COMBINED_STATS, (
+                today, today + timedelta(days=1),
+                month_start, next_month_start
+            ))
+            row = await cursor.fetchone()
+
+        result = {
+            'today_total': row['today_total'] or Decimal('0'),
+            'month_total': row['month_total'] or Decimal('0'),
+            'total_payments': int(row['total_count']) if row['total_count'] else 0,
+            'total_amount': row['total_amount'] or Decimal('0'),
+            'average_amount': row['avg_amount'] or Decimal('0'),
+            'max_amount': row['max_amount'] or Decimal('0'),
+            'min_amount': row['min_amount'] or Decimal('0'),
+            'unique_members': int(row['unique_members']) if row['unique_members'] else 0
+        }
+        _cache_set(('combined', today), result)
+        return result
 
+    except Exception as e:
+        logger.error(f"❌ Error fetching combined stats: {e}")
+        raise
 
-# Create a singleton instance for convenience
-payment_controller = PaymentController()
@@ -23,12 +23,10 @@ Usage:
     python main.py
 """
 
-import os
 import sys
 import asyncio
 import signal
 import logging
-from logging.handlers import RotatingFileHandler
 from datetime import datetime
 
 from dotenv import load_dotenv
@@ -39,39 +37,10 @@ load_dotenv()
 # Import after env is loaded
 from config.db import init_db, close_db
 from services.telegram_bot import create_application, set_bot_commands
+from utils.logging_setup import setup_logging
 
-
-def setup_logging() -> None:
-    """Configure logging for the application."""
-    log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
-    
-    # Create logs directory if it doesn't exist
-    os.makedirs('logs', exist_ok=True)
-    
-    # Configure root logger
-    logging.basicConfig(
-        level=getattr(logging, log_level, logging.INFO),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[
-            # Console handler
-            logging.StreamHandler(sys.stdout),
-            # File handler with rotation
-            RotatingFileHandler(
-                'logs/bot.log',
-                maxBytes=5*1024*1024,  # 5 MB
-                backupCount=5,
-                encoding='utf-8'
-            )
-        ]
-    )
-    
-    # Reduce noise from external libraries
-    logging.getLogger('httpx').setLevel(logging.WARNING)
-    logging.getLogger('httpcore').setLevel(logging.WARNING)
-    logging.getLogger('telegram').setLevel(logging.WARNING)
-    
-    logger = logging.getLogger(__name__)
-    logger.info(f"Logging configured with level: {log_level}")
+# Configure logging
+logger = logging.getLogger(__name__)
 
 
 def print_banner() -> None:
@@ -85,7 +54,6 @@ def print_banner() -> None:
 
 async def main() -> None:
     """Main entry point for the application."""
-    logger = logging.getLogger(__name__)
     application = None
     
     try:
@@ -95,7 +63,7 @@ async def main() -> None:
         
         # Initialize database
         logger.info("📦 Initializing database connection...")
-        init_db()
+        await init_db()
         
         # Create bot application
         logger.info("🤖 Initializing Telegram bot...")
@@ -187,7 +155,7 @@ async def main() -> None:
         
         # Close database connections
         try:
-            close_db()
+            await close_db()
         except Exception as e:
             logger.error(f"Error closing database: {e}")
         
@@ -16,40 +16,42 @@ Features:
 - Statistics
 """
 
-import os
 import logging
-import tempfile
+import time
 from datetime import datetime
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
 from telegram import Update
 from telegram.ext import ContextTypes
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-from openpyxl.utils import get_column_letter
-
-from controllers.payment_controller import payment_controller
+from controllers import payment_controller
+from services import xlsx_stream
+from services.xlsx_stream import escape
+from utils.text import capitalize_first
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Store reset confirmations (user_id -> timestamp)
-reset_confirmations: Dict[int, float] = {}
+# Store reset confirmations (user_id -> (monotonic timestamp, stats)).
+# Monotonic time is immune to wall-clock jumps from NTP/DST; the stats
+# snapshot taken at /reset is reused by /confirm_reset, saving a DB
+# round-trip and keeping the shown numbers consistent across both steps
+reset_confirmations: Dict[int, Tuple[float, dict]] = {}
 RESET_TIMEOUT = 60  # 60 seconds to confirm reset
 
 
-def capitalize_first(text: str) -> str:
-    """Capitalize the first letter of a string."""
-    if not text:
-        return text
-    return text[0].upper() + text[1:].lower()
-
+# strftime is a comparatively expensive C call and the table/member/
+# export loops format many repeated timestamps (several payments on the
+# same day), so both helpers memoize on the datetime itself - the
+# mapping never changes, making a shared cache safe across requests.
 
+@lru_cache(maxsize=1024)
 def format_short_date(dt: datetime) -> str:
     """Format date as YYYY-MM-DD."""
     return dt.strftime('%Y-%m-%d')
 
 
+@lru_cache(maxsize=1024)
 def format_full_datetime(dt: datetime) -> str:
     """Format date as YYYY-MM-DD HH:MM:SS."""
     return dt.strftime('%Y-%m-%d %H:%M:%S')
@@ -64,36 +66,45 @@ async def handle_table_command(update: Update, context: ContextTypes.DEFAULT_TYP
         context: Callback context
     """
     chat_id = update.effective_chat.id
-    
+    # Bind the send method once - LOAD_FAST instead of two chained
+    # attribute lookups per call (same hoist in the handlers below)
+    send_message = context.bot.send_message
+
     try:
-        payments = payment_controller.get_last_payments(20)
+        payments = await payment_controller.get_last_payments(20)
         
         if not payments:
-            await context.bot.send_message(chat_id, '📭 No payment records found.')
+            await send_message(chat_id, '📭 No payment records found.')
             return
         
-        # Build formatted table
-        message = '📊 *Last 20 Payments*\n\n'
-        message += '```\n'
-        message += 'ID   | Member     | Amount    | Date\n'
-        message += '-----+------------+-----------+------------\n'
-        
+        # Build formatted table - collected as lines and joined once
+        # instead of growing a string per row
+        lines = [
+            '📊 *Last 20 Payments*',
+            '',
+            '```',
+            'ID   | Member     | Amount    | Date',
+            '-----+------------+-----------+------------',
+        ]
+
         for payment in payments:
-            pid = str(payment['id']).ljust(4)
-            name = str(payment['member_name'])[:10].ljust(10)
-            amount = f"Rs.{float(payment['amount']):.0f}".ljust(9)
+            # Pad with format-spec widths in a single f-string pass
+            # rather than building intermediate .ljust() strings
+            name = str(payment['member_name'])[:10]
+            amount = f"Rs.{float(payment['amount']):.0f}"
             date = format_short_date(payment['payment_date'])
-            
-            message += f'{pid} | {name} | {amount} | {date}\n'
-        
-        message += '```'
-        
-        await context.bot.send_message(chat_id, message, parse_mode='Markdown')
+
+            lines.append(f"{payment['id']:<4} | {name:<10} | {amount:<9} | {date}")
+
+        lines.append('```')
+        message = '\n'.join(lines)
+
+        await send_message(chat_id, message, parse_mode='Markdown')
         logger.info('📊 Table command executed')
         
     except Exception as e:
         logger.error(f'❌ Error in table command: {e}')
-        await context.bot.send_message(chat_id, '❌ Error fetching payment records.')
+        await send_message(chat_id, '❌ Error fetching payment records.')
 
 
 async def handle_today_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -105,9 +116,10 @@ async def handle_today_command(update: Update, context: ContextTypes.DEFAULT_TYP
         context: Callback context
     """
     chat_id = update.effective_chat.id
-    
+    send_message = context.bot.send_message
+
     try:
-        result = payment_controller.get_today_total()
+        result = await payment_controller.get_today_total()
         
         message = (
             f"📅 *Today's Collection ({result['date']})*\n\n"
@@ -115,12 +127,12 @@ async def handle_today_command(update: Update, context: ContextTypes.DEFAULT_TYP
             f"📝 Number of Payments: *{result['count']}*"
         )
         
-        await context.bot.send_message(chat_id, message, parse_mode='Markdown')
+        await send_message(chat_id, message, parse_mode='Markdown')
         logger.info('📅 Today command executed')
         
     except Exception as e:
         logger.error(f"❌ Error in today command: {e}")
-        await context.bot.send_message(chat_id, "❌ Error fetching today's total.")
+        await send_message(chat_id, "❌ Error fetching today's total.")
 
 
 async def handle_month_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -132,9 +144,10 @@ async def handle_month_command(update: Update, context: ContextTypes.DEFAULT_TYP
         context: Callback context
     """
     chat_id = update.effective_chat.id
-    
+    send_message = context.bot.send_message
+
     try:
-        result = payment_controller.get_month_total()
+        result = await payment_controller.get_month_total()
         
         message = (
             f"📆 *{result['month_name']} {result['year']} Collection*\n\n"
@@ -142,12 +155,12 @@ async def handle_month_command(update: Update, context: ContextTypes.DEFAULT_TYP
             f"📝 Number of Payments: *{result['count']}*"
         )
         
-        await context.bot.send_message(chat_id, message, parse_mode='Markdown')
+        await send_message(chat_id, message, parse_mode='Markdown')
         logger.info('📆 Month command executed')
         
     except Exception as e:
         logger.error(f'❌ Error in month command: {e}')
-        await context.bot.send_message(chat_id, "❌ Error fetching monthly total.")
+        await send_message(chat_id, "❌ Error fetching monthly total.")
 
 
 async def handle_member_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -159,10 +172,11 @@ async def handle_member_command(update: Update, context: ContextTypes.DEFAULT_TY
         context: Callback context
     """
     chat_id = update.effective_chat.id
-    
+    send_message = context.bot.send_message
+
     # Check if member name is provided
     if not context.args:
-        await context.bot.send_message(
+        await send_message(
             chat_id,
             '❌ Please provide a member name.\nUsage: /member <name>'
         )
@@ -171,38 +185,40 @@ async def handle_member_command(update: Update, context: ContextTypes.DEFAULT_TY
     member_name = context.args[0]
     
     try:
-        result = payment_controller.get_member_payments(member_name)
+        result = await payment_controller.get_member_payments(member_name)
         
         if not result['payments']:
-            await context.bot.send_message(
+            await send_message(
                 chat_id,
                 f'❌ No payment records found for member: {member_name}'
             )
             return
         
-        # Build member summary
-        message = (
-            f"👤 *Payment History: {capitalize_first(result['member_name'])}*\n\n"
-            f"💰 Total Paid: *Rs.{result['total_amount']:.2f}*\n"
-            f"📝 Total Payments: *{result['total_payments']}*\n\n"
-            f"*Recent Payments:*\n"
-        )
-        
+        # Build member summary - lines collected and joined once
+        lines = [
+            f"👤 *Payment History: {capitalize_first(result['member_name'])}*\n",
+            f"💰 Total Paid: *Rs.{result['total_amount']:.2f}*",
+            f"📝 Total Payments: *{result['total_payments']}*\n",
+            "*Recent Payments:*",
+        ]
+
         # Show up to 10 recent payments
         recent_payments = result['payments'][:10]
         for payment in recent_payments:
             date = format_short_date(payment['payment_date'])
-            message += f"• Rs.{float(payment['amount']):.2f} on {date}\n"
-        
+            lines.append(f"• Rs.{float(payment['amount']):.2f} on {date}")
+
         if len(result['payments']) > 10:
-            message += f"\n_... and {len(result['payments']) - 10} more payments_"
-        
-        await context.bot.send_message(chat_id, message, parse_mode='Markdown')
-        logger.info(f'👤 Member command executed for: {member_name}')
+            lines.append(f"\n_... and {len(result['payments']) - 10} more payments_")
+
+        message = '\n'.join(lines)
+
+        await send_message(chat_id, message, parse_mode='Markdown')
+        logger.info('👤 Member command executed for: %s', member_name)
         
     except Exception as e:
         logger.error(f'❌ Error in member command: {e}')
-        await context.bot.send_message(chat_id, '❌ Error fetching member records.')
+        await send_message(chat_id, '❌ Error fetching member records.')
 
 
 async def handle_export_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -214,111 +230,91 @@ async def handle_export_command(update: Update, context: ContextTypes.DEFAULT_TY
         context: Callback context
     """
     chat_id = update.effective_chat.id
-    filepath = None
-    
+    send_message = context.bot.send_message
+    send_document = context.bot.send_document
+
     try:
         # Notify user that export is in progress
-        await context.bot.send_message(chat_id, '📤 Generating Excel export...')
-        
-        payments = payment_controller.get_all_payments()
-        
-        if not payments:
-            await context.bot.send_message(chat_id, '📭 No records to export.')
+        await send_message(chat_id, '📤 Generating Excel export...')
+
+        # Total and count come from a SQL aggregate - the sum runs in
+        # the database engine and the write loop below stays a pure
+        # sink with no per-row accumulation
+        summary = await payment_controller.get_payment_summary()
+
+        if summary['count'] == 0:
+            await send_message(chat_id, '📭 No records to export.')
             return
-        
-        logger.info(f'📤 Preparing export for {len(payments)} records...')
-        
-        # Create workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = 'Payments'
-        
-        # Define styles
-        header_font = Font(bold=True, color='FFFFFF')
-        header_fill = PatternFill(start_color='4472C4', end_color='4472C4', fill_type='solid')
-        header_alignment = Alignment(horizontal='center', vertical='center')
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Headers
+
+
+        # The sheet XML is emitted directly - one f-string per payment
+        # instead of five cell objects - and zipped with the static
+        # package parts by services.xlsx_stream
         headers = ['ID', 'Member Name', 'Amount (Rs.)', 'Recorded By (User ID)', 'Payment Date']
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col, value=header)
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = thin_border
-        
-        # Data rows
-        total_amount = 0.0
-        for row_num, payment in enumerate(payments, 2):
+        rows = [xlsx_stream.header_row(headers)]
+
+        # Data rows - streamed from the database one at a time so the
+        # export doesn't buffer the whole table in memory. Globals and
+        # bound methods used each iteration are hoisted into locals
+        # first; LOAD_FAST beats repeated LOAD_GLOBAL/LOAD_ATTR in the
+        # only per-row loop in the bot
+        rows_append = rows.append
+        _escape = escape
+        _cap = capitalize_first
+        _fmt = format_full_datetime
+
+        r = 1
+        async for payment in payment_controller.iter_all_payments():
+            r += 1
             amount = float(payment['amount'])
-            total_amount += amount
-            
-            ws.cell(row=row_num, column=1, value=payment['id']).border = thin_border
-            ws.cell(row=row_num, column=2, value=capitalize_first(payment['member_name'])).border = thin_border
-            ws.cell(row=row_num, column=3, value=f"{amount:.2f}").border = thin_border
-            ws.cell(row=row_num, column=4, value=str(payment['recorded_by'])).border = thin_border
-            ws.cell(row=row_num, column=5, value=format_full_datetime(payment['payment_date'])).border = thin_border
-        
-        # Summary row
-        summary_row = len(payments) + 3
-        ws.cell(row=summary_row, column=1, value='TOTAL').font = Font(bold=True)
-        ws.cell(row=summary_row, column=3, value=f"{total_amount:.2f}").font = Font(bold=True)
-        
-        # Set column widths
-        column_widths = [8, 20, 15, 22, 22]
-        for col, width in enumerate(column_widths, 1):
-            ws.column_dimensions[get_column_letter(col)].width = width
-        
+            name = _escape(_cap(payment['member_name']))
+            paid_on = _fmt(payment['payment_date'])
+
+            rows_append(
+                f'<row r="{r}">'
+                f'<c r="A{r}" t="n"><v>{payment["id"]}</v></c>'
+                f'<c r="B{r}" t="inlineStr"><is><t>{name}</t></is></c>'
+                f'<c r="C{r}" t="inlineStr"><is><t>{amount:.2f}</t></is></c>'
+                f'<c r="D{r}" t="inlineStr"><is><t>{payment["recorded_by"]}</t></is></c>'
+                f'<c r="E{r}" t="inlineStr"><is><t>{paid_on}</t></is></c>'
+                f'</row>'
+            )
+
+        # Summary row (after one empty spacer row)
+        r += 2
+        rows.append(
+            f'<row r="{r}">'
+            f'<c r="A{r}" t="inlineStr" s="{xlsx_stream.TOTAL_STYLE}"><is><t>TOTAL</t></is></c>'
+            f'<c r="C{r}" t="inlineStr" s="{xlsx_stream.TOTAL_STYLE}"><is><t>{summary["total"]:.2f}</t></is></c>'
+            f'</row>'
+        )
+
         # Generate filename with timestamp
         timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
         filename = f'society_payments_{timestamp}.xlsx'
-        filepath = os.path.join(tempfile.gettempdir(), filename)
-        
-        logger.info(f'📤 Writing Excel file to: {filepath}')
-        
-        # Save workbook
-        wb.save(filepath)
-        
-        # Verify file exists
-        if not os.path.exists(filepath):
-            raise Exception('Excel file was not created')
-        
-        file_size = os.path.getsize(filepath)
-        logger.info(f'📤 Excel file created, size: {file_size} bytes')
-        
+
+        # Assemble the .xlsx in memory - no temp file write or cleanup
+        buffer = xlsx_stream.build_xlsx(rows, column_widths=[8, 20, 15, 22, 22])
+
+        logger.info('📤 Excel file created, size: %d bytes', buffer.getbuffer().nbytes)
+
         # Send file to Telegram
-        with open(filepath, 'rb') as file:
-            await context.bot.send_document(
-                chat_id,
-                document=file,
-                filename=filename,
-                caption=(
-                    f"📊 Society Payments Export\n"
-                    f"📝 Total Records: {len(payments)}\n"
-                    f"💰 Total Amount: Rs.{total_amount:.2f}"
-                )
+        await send_document(
+            chat_id,
+            document=buffer,
+            filename=filename,
+            caption=(
+                f"📊 Society Payments Export\n"
+                f"📝 Total Records: {summary['count']}\n"
+                f"💰 Total Amount: Rs.{summary['total']:.2f}"
             )
-        
-        logger.info(f'✅ Export completed: {len(payments)} records sent')
-        
+        )
+
+        logger.info('✅ Export completed: %d records sent', summary['count'])
+
     except Exception as e:
         logger.error(f'❌ Error in export command: {e}')
-        await context.bot.send_message(chat_id, f'❌ Error generating export file: {e}')
-    
-    finally:
-        # Clean up temporary file
-        if filepath and os.path.exists(filepath):
-            try:
-                os.remove(filepath)
-                logger.info('🗑️ Temporary file deleted')
-            except Exception as e:
-                logger.warning(f'⚠️ Could not delete temp file: {e}')
+        await send_message(chat_id, f'❌ Error generating export file: {e}')
 
 
 async def handle_reset_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -331,17 +327,27 @@ async def handle_reset_command(update: Update, context: ContextTypes.DEFAULT_TYP
     """
     chat_id = update.effective_chat.id
     user_id = update.effective_user.id
-    
+    send_message = context.bot.send_message
+
+    # Sweep expired confirmations - a user who runs /reset and never
+    # confirms would otherwise leave an entry behind forever
+    now = time.monotonic()
+    expired = [uid for uid, (ts, _) in reset_confirmations.items()
+               if now - ts >= RESET_TIMEOUT]
+    for uid in expired:
+        reset_confirmations.pop(uid, None)
+
     try:
         # Get current stats before reset
-        stats = payment_controller.get_payment_stats()
+        stats = await payment_controller.get_payment_stats()
         
         if stats['total_payments'] == 0:
-            await context.bot.send_message(chat_id, '📭 No records to delete.')
+            await send_message(chat_id, '📭 No records to delete.')
             return
         
-        # Store reset confirmation request with timestamp
-        reset_confirmations[user_id] = datetime.now().timestamp()
+        # Store reset confirmation request with timestamp and the stats
+        # snapshot so /confirm_reset doesn't have to query them again
+        reset_confirmations[user_id] = (time.monotonic(), stats)
         
         message = (
             "⚠️ *WARNING: Reset Confirmation Required*\n\n"
@@ -354,12 +360,12 @@ async def handle_reset_command(update: Update, context: ContextTypes.DEFAULT_TYP
             "This confirmation will expire in 60 seconds."
         )
         
-        await context.bot.send_message(chat_id, message, parse_mode='Markdown')
-        logger.warning(f'⚠️ Reset requested by user {user_id}')
+        await send_message(chat_id, message, parse_mode='Markdown')
+        logger.warning('⚠️ Reset requested by user %s', user_id)
         
     except Exception as e:
         logger.error(f'❌ Error in reset command: {e}')
-        await context.bot.send_message(chat_id, '❌ Error processing reset request.')
+        await send_message(chat_id, '❌ Error processing reset request.')
 
 
 async def handle_confirm_reset_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -372,39 +378,41 @@ async def handle_confirm_reset_command(update: Update, context: ContextTypes.DEF
     """
     chat_id = update.effective_chat.id
     user_id = update.effective_user.id
-    
+    send_message = context.bot.send_message
+
     try:
-        # Check if this user has a valid reset confirmation pending
-        confirmation_time = reset_confirmations.get(user_id)
-        now = datetime.now().timestamp()
-        
-        if not confirmation_time or (now - confirmation_time) >= RESET_TIMEOUT:
-            await context.bot.send_message(
+        # Check if this user has a valid reset confirmation pending -
+        # pop removes it in the same lookup whether it's valid or stale
+        confirmation = reset_confirmations.pop(user_id, None)
+        now = time.monotonic()
+
+        if not confirmation or (now - confirmation[0]) >= RESET_TIMEOUT:
+            await send_message(
                 chat_id,
                 '❌ No valid reset request found or it has expired.\nPlease use /reset first.'
             )
-            # Clean up expired confirmation
-            reset_confirmations.pop(user_id, None)
             return
-        
-        # Remove the confirmation
-        reset_confirmations.pop(user_id, None)
-        
+
+        # Stats snapshot taken at /reset time - no second query needed
+        stats = confirmation[1]
+
         # Execute reset
-        result = payment_controller.reset_all_payments()
-        
+        result = await payment_controller.reset_all_payments()
+
         message = (
             "🗑️ *Reset Complete*\n\n"
-            f"Successfully deleted *{result['deleted_count']}* payment records.\n"
+            f"Successfully deleted *{result['deleted_count']}* payment records "
+            f"totaling *Rs.{stats['total_amount']:.2f}*.\n"
             "The database is now empty."
         )
         
-        await context.bot.send_message(chat_id, message, parse_mode='Markdown')
-        logger.warning(f"🗑️ Reset executed by admin {user_id}: {result['deleted_count']} records deleted")
+        await send_message(chat_id, message, parse_mode='Markdown')
+        logger.warning("🗑️ Reset executed by admin %s: %s records deleted",
+                       user_id, result['deleted_count'])
         
     except Exception as e:
         logger.error(f'❌ Error executing reset: {e}')
-        await context.bot.send_message(chat_id, '❌ Error executing reset.')
+        await send_message(chat_id, '❌ Error executing reset.')
 
 
 async def handle_stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -416,28 +424,31 @@ async def handle_stats_command(update: Update, context: ContextTypes.DEFAULT_TYP
         context: Callback context
     """
     chat_id = update.effective_chat.id
-    
+    send_message = context.bot.send_message
+
     try:
-        stats = payment_controller.get_payment_stats()
-        
+        stats = await payment_controller.get_combined_stats()
+
         if stats['total_payments'] == 0:
-            await context.bot.send_message(chat_id, '📭 No payment records found.')
+            await send_message(chat_id, '📭 No payment records found.')
             return
-        
+
         message = (
             "📈 *Payment Statistics*\n\n"
             f"📝 Total Payments: *{stats['total_payments']}*\n"
             f"👥 Unique Members: *{stats['unique_members']}*\n\n"
             "💰 *Amount Summary:*\n"
+            f"• Today: *Rs.{stats['today_total']:.2f}*\n"
+            f"• This Month: *Rs.{stats['month_total']:.2f}*\n"
             f"• Total: *Rs.{stats['total_amount']:.2f}*\n"
             f"• Average: *Rs.{stats['average_amount']:.2f}*\n"
             f"• Highest: *Rs.{stats['max_amount']:.2f}*\n"
             f"• Lowest: *Rs.{stats['min_amount']:.2f}*"
         )
         
-        await context.bot.send_message(chat_id, message, parse_mode='Markdown')
+        await send_message(chat_id, message, parse_mode='Markdown')
         logger.info('📈 Stats command executed')
         
     except Exception as e:
         logger.error(f'❌ Error in stats command: {e}')
-        await context.bot.send_message(chat_id, '❌ Error fetching statistics.')
+        await send_message(chat_id, '❌ Error fetching statistics.')
@@ -18,10 +18,12 @@ import os
 import re
 import logging
 from datetime import datetime
-from typing import List, Set
+from typing import FrozenSet, List
 
 from telegram import Update, BotCommand
+from telegram.request import HTTPXRequest
 from telegram.ext import (
+    AIORateLimiter,
     Application,
     CommandHandler,
     MessageHandler,
@@ -30,8 +32,12 @@ from telegram.ext import (
 )
 from dotenv import load_dotenv
 
-from controllers.payment_controller import payment_controller
+from controllers import payment_controller
 from routes import bot_routes
+# Shared implementation lives in utils so neither routes nor services
+# has to reach into the other at import time; the old name stays
+# exported for existing callers
+from utils.text import capitalize_first as capitalize_first_letter
 
 # Load environment variables
 load_dotenv()
@@ -39,8 +45,14 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
-# Admin user IDs from environment variable
-ADMIN_IDS: Set[int] = set()
+# Admin user IDs from environment variable. Frozen after load - the
+# membership check runs on every admin command, and a frozenset lookup
+# skips the mutability guard a plain set pays
+ADMIN_IDS: FrozenSet[int] = frozenset()
+
+# Allow only letters (including Unicode letters for international names),
+# compiled once - is_valid_name runs for every inbound text message
+_NAME_RE = re.compile(r'^[a-zA-Z\u00C0-\u024F\u1E00-\u1EFF]+$')
 
 
 def load_admin_ids() -> None:
@@ -49,15 +61,17 @@ def load_admin_ids() -> None:
     admin_ids_str = os.getenv('ADMIN_IDS', '')
     
     if admin_ids_str:
-        try:
-            ADMIN_IDS = {
-                int(id_str.strip())
-                for id_str in admin_ids_str.split(',')
-                if id_str.strip().isdigit()
-            }
-        except ValueError as e:
-            logger.error(f"Error parsing ADMIN_IDS: {e}")
-            ADMIN_IDS = set()
+        # Single pass over the list; removeprefix strips at most one
+        # leading hyphen and isdecimal only accepts 0-9 digits (unlike
+        # isdigit, which admits superscripts int() rejects), so the
+        # filter passes exactly what int() can parse - malformed
+        # entries are skipped instead of crashing startup. Negative
+        # IDs (group test accounts) still parse.
+        parts = (id_str.strip() for id_str in admin_ids_str.split(','))
+        ADMIN_IDS = frozenset(
+            int(part) for part in parts
+            if part and part.removeprefix('-').isdecimal()
+        )
     
     logger.info(f"👮 Admin IDs: {', '.join(map(str, ADMIN_IDS)) if ADMIN_IDS else 'None configured'}")
 
@@ -85,12 +99,13 @@ def is_valid_name(name: str) -> bool:
     Returns:
         True if valid
     """
-    if not name or len(name) == 0 or len(name) > 100:
+    if not name or len(name) > 100:
         return False
-    
-    # Allow only letters (including Unicode letters for international names)
-    pattern = r'^[a-zA-Z\u00C0-\u024F\u1E00-\u1EFF]+$'
-    return bool(re.match(pattern, name))
+    # ASCII names (the common case) are checked with str.isalpha, a
+    # single C-level pass; only non-ASCII input falls back to the regex
+    if name.isascii():
+        return name.isalpha()
+    return _NAME_RE.match(name) is not None
 
 
 def is_valid_amount(amount_str: str) -> bool:
@@ -110,21 +125,6 @@ def is_valid_amount(amount_str: str) -> bool:
         return False
 
 
-def capitalize_first_letter(text: str) -> str:
-    """
-    Capitalize first letter of a string.
-    
-    Args:
-        text: String to capitalize
-        
-    Returns:
-        Capitalized string
-    """
-    if not text:
-        return text
-    return text[0].upper() + text[1:].lower()
-
-
 def format_datetime(dt: datetime) -> str:
     """
     Format date and time for display.
@@ -191,71 +191,75 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
     await context.bot.send_message(chat_id, message, parse_mode='Markdown')
 
 
-async def admin_only(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
-    """
-    Check if user is admin and send unauthorized message if not.
-    
-    Returns:
-        True if user is admin, False otherwise
-    """
-    user_id = update.effective_user.id
-    
-    if not is_admin(user_id):
-        await context.bot.send_message(
-            update.effective_chat.id,
-            '🔒 This command is only available to administrators.'
-        )
-        return False
-    
-    return True
+_UNAUTHORIZED_MESSAGE = '🔒 This command is only available to administrators.'
+
+# The admin gate below is inlined as `user_id in ADMIN_IDS` rather than
+# routed through a helper coroutine - it runs for every admin command
+# and the extra awaited call added two frame pushes per invocation.
 
 
 async def table_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /table command - Admin only."""
-    if await admin_only(update, context):
+    if update.effective_user.id in ADMIN_IDS:
         await bot_routes.handle_table_command(update, context)
+    else:
+        await context.bot.send_message(update.effective_chat.id, _UNAUTHORIZED_MESSAGE)
 
 
 async def today_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /today command - Admin only."""
-    if await admin_only(update, context):
+    if update.effective_user.id in ADMIN_IDS:
         await bot_routes.handle_today_command(update, context)
+    else:
+        await context.bot.send_message(update.effective_chat.id, _UNAUTHORIZED_MESSAGE)
 
 
 async def month_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /month command - Admin only."""
-    if await admin_only(update, context):
+    if update.effective_user.id in ADMIN_IDS:
         await bot_routes.handle_month_command(update, context)
+    else:
+        await context.bot.send_message(update.effective_chat.id, _UNAUTHORIZED_MESSAGE)
 
 
 async def member_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /member command - Admin only."""
-    if await admin_only(update, context):
+    if update.effective_user.id in ADMIN_IDS:
         await bot_routes.handle_member_command(update, context)
+    else:
+        await context.bot.send_message(update.effective_chat.id, _UNAUTHORIZED_MESSAGE)
 
 
 async def export_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /export command - Admin only."""
-    if await admin_only(update, context):
+    if update.effective_user.id in ADMIN_IDS:
         await bot_routes.handle_export_command(update, context)
+    else:
+        await context.bot.send_message(update.effective_chat.id, _UNAUTHORIZED_MESSAGE)
 
 
 async def reset_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /reset command - Admin only."""
-    if await admin_only(update, context):
+    if update.effective_user.id in ADMIN_IDS:
         await bot_routes.handle_reset_command(update, context)
+    else:
+        await context.bot.send_message(update.effective_chat.id, _UNAUTHORIZED_MESSAGE)
 
 
 async def confirm_reset_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /confirm_reset command - Admin only."""
-    if await admin_only(update, context):
+    if update.effective_user.id in ADMIN_IDS:
         await bot_routes.handle_confirm_reset_command(update, context)
+    else:
+        await context.bot.send_message(update.effective_chat.id, _UNAUTHORIZED_MESSAGE)
 
 
 async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handle /stats command - Admin only."""
-    if await admin_only(update, context):
+    if update.effective_user.id in ADMIN_IDS:
         await bot_routes.handle_stats_command(update, context)
+    else:
+        await context.bot.send_message(update.effective_chat.id, _UNAUTHORIZED_MESSAGE)
 
 
 # ============================================
@@ -277,31 +281,35 @@ async def handle_payment_message(update: Update, context: ContextTypes.DEFAULT_T
     text = update.message.text.strip()
     user_id = update.effective_user.id
     user_name = update.effective_user.first_name or update.effective_user.username or 'Unknown'
+    # This handler runs for every text message; bind the send method
+    # once instead of two attribute lookups per reply
+    send_message = context.bot.send_message
     
-    # Log incoming message
-    logger.info(f"📩 Message from {user_name} ({user_id}): {text}")
+    # Log incoming message - %-style so interpolation is skipped
+    # entirely when INFO is filtered out; this runs per text message
+    logger.info("📩 Message from %s (%s): %s", user_name, user_id, text)
     
-    # Check if message contains hyphen
-    if '-' not in text:
+    # Parse the payment format (name-amount) in a single pass -
+    # partition finds the hyphen and splits without a list allocation
+    name, sep, amount_str = text.partition('-')
+
+    if not sep:
         return  # Ignore messages without hyphen
-    
-    # Parse the payment format: name-amount
-    parts = text.split('-')
-    
-    # Must have exactly 2 parts
-    if len(parts) != 2:
-        await context.bot.send_message(
+
+    # A second hyphen means the message isn't name-amount
+    if '-' in amount_str:
+        await send_message(
             chat_id,
             '❌ Invalid format. Use: name-amount (example: kamal-500)'
         )
         return
-    
-    name = parts[0].strip()
-    amount_str = parts[1].strip()
+
+    name = name.strip()
+    amount_str = amount_str.strip()
     
     # Validate name
     if not is_valid_name(name):
-        await context.bot.send_message(
+        await send_message(
             chat_id,
             '❌ Invalid format. Use: name-amount (example: kamal-500)'
         )
@@ -309,7 +317,7 @@ async def handle_payment_message(update: Update, context: ContextTypes.DEFAULT_T
     
     # Validate amount
     if not is_valid_amount(amount_str):
-        await context.bot.send_message(
+        await send_message(
             chat_id,
             '❌ Invalid format. Use: name-amount (example: kamal-500)'
         )
@@ -319,7 +327,7 @@ async def handle_payment_message(update: Update, context: ContextTypes.DEFAULT_T
     
     try:
         # Insert payment into database
-        payment = payment_controller.insert_payment(name, amount, user_id)
+        payment = await payment_controller.insert_payment(name, amount, user_id)
         
         # Format the date
         payment_date = payment['payment_date']
@@ -336,12 +344,12 @@ async def handle_payment_message(update: Update, context: ContextTypes.DEFAULT_T
             f"Date: {formatted_date}"
         )
         
-        await context.bot.send_message(chat_id, success_message)
-        logger.info(f"✅ Payment recorded: {display_name} - Rs.{amount}")
+        await send_message(chat_id, success_message)
+        logger.info("✅ Payment recorded: %s - Rs.%s", display_name, amount)
         
     except Exception as e:
         logger.error(f"❌ Error recording payment: {e}")
-        await context.bot.send_message(
+        await send_message(
             chat_id,
             '❌ Failed to record payment. Please try again.'
         )
@@ -384,8 +392,29 @@ def create_application() -> Application:
     # Load admin IDs
     load_admin_ids()
     
-    # Create application
-    application = Application.builder().token(token).build()
+    # Outgoing API client: a bigger connection pool plus HTTP/2 lets
+    # concurrent handler sends multiplex instead of serializing on the
+    # default pool when several admins run commands at once
+    request = HTTPXRequest(
+        connection_pool_size=64,
+        http_version='2',
+        read_timeout=30
+    )
+
+    # Create application. The rate limiter queues outgoing API calls to
+    # stay under Telegram's 30 msg/s global and per-group caps, so a
+    # burst of commands degrades to a short queue instead of 429 retry
+    # storms that stall the event loop.
+    application = (
+        Application.builder()
+        .token(token)
+        .request(request)
+        .get_updates_request(
+            HTTPXRequest(connection_pool_size=2, http_version='2')
+        )
+        .rate_limiter(AIORateLimiter())
+        .build()
+    )
     
     # Add command handlers
     application.add_handler(CommandHandler("start", start_command))
@@ -0,0 +1,6 @@
+"""Utils package initialization."""
+
+from .logging_setup import setup_logging
+from .text import capitalize_first
+
+__all__ = ['setup_logging', 'capitalize_first']
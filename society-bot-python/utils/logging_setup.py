@@ -0,0 +1,85 @@
+"""
+============================================
+Logging Setup - Shared Logging Configuration
+============================================
+
+This module configures logging for both entry points
+(main.py polling mode and app.py Render web mode).
+
+Features:
+- Queue-based handlers - log I/O runs off the hot path
+- Rotating file handler with console output
+- Idempotent setup - safe to call from multiple entry points
+- Environment-based log level
+"""
+
+import atexit
+import os
+import queue
+import sys
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+
+def setup_logging() -> None:
+    """
+    Configure logging for the application.
+
+    Safe to call more than once: repeat calls are no-ops, so the two
+    entry points can't double-install handlers and write every record
+    twice.
+    """
+    if getattr(setup_logging, '_done', False):
+        return
+    setup_logging._done = True
+
+    log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+    # Create logs directory if it doesn't exist
+    os.makedirs('logs', exist_ok=True)
+
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    # Console handler
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+
+    # File handler with rotation. A large maxBytes keeps rollovers rare:
+    # the rename/create/cleanup work is amortized over far more writes.
+    file_handler = RotatingFileHandler(
+        'logs/bot.log',
+        maxBytes=int(os.getenv('LOG_MAX_BYTES', str(50 * 1024 * 1024))),  # 50 MB
+        backupCount=int(os.getenv('LOG_BACKUP_COUNT', '3')),
+        encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter)
+
+    # Run the real handlers on a background thread so hot-path logger
+    # calls only enqueue the record instead of doing file/console I/O
+    log_queue: queue.Queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, console_handler, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    # The queue handler gets a message-only formatter: QueueHandler
+    # bakes its formatter's output into the record before enqueueing,
+    # and the listener-side handlers apply the full format - anything
+    # richer here would be formatted twice
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
+    # Configure root logger to feed the queue; force=True replaces any
+    # handlers a library may have installed rather than duplicating them
+    logging.basicConfig(
+        level=getattr(logging, log_level, logging.INFO),
+        handlers=[queue_handler],
+        force=True
+    )
+
+    # Reduce noise from external libraries
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    logging.getLogger('httpcore').setLevel(logging.WARNING)
+    logging.getLogger('telegram').setLevel(logging.WARNING)
+    logging.getLogger('aiohttp').setLevel(logging.WARNING)
+
+    logging.getLogger(__name__).info(f"Logging configured with level: {log_level}")
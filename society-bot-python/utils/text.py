@@ -0,0 +1,17 @@
+"""
+============================================
+Text Utilities - Shared String Helpers
+============================================
+
+This module holds string helpers shared between the routes and
+services packages. It lives in utils so neither package has to import
+the other for them - routes and services already import each other in
+one direction, and pulling helpers across that edge created a cycle.
+"""
+
+
+def capitalize_first(text: str) -> str:
+    """Capitalize the first letter of a string."""
+    # str.capitalize does upper-first/lower-rest in one C-level pass,
+    # versus the slice + two case conversions + concat it replaces
+    return text.capitalize() if text else text